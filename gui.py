@@ -1,7 +1,98 @@
 #!/usr/bin/env python3
 #-*- coding: utf-8 -*-
 
+import queue
+import threading
 import tkinter as tk
+from tkinter import filedialog, ttk
+
+import pp
+
+# result table columns - keys of pp.score matches
+COLUMNS = [pp.ID, pp.TITLE, "page_title", "direct", "partial", "confident", "link"]
+POLL_MS = 100
+
+class SearchWorker:
+    """
+    Runs title searches & batch file jobs on a background thread.
+    Progress & matches are posted as (kind, payload) messages to self.results
+    for the UI thread to poll, so tkinter's mainloop never blocks on the network.
+    """
+
+    def __init__(self, engine="ALL"):
+        self.engine = engine
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        # bumped on cancel; tasks submitted under an older generation are dropped
+        self.generation = 0
+        # submitted tasks not yet finished (queued or in flight)
+        self.active = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit_title(self, title=None):
+        if not title or not title.strip():
+            return
+        rec = {pp.ID: "NA", pp.AUTHORS: "NA", pp.TYPE: "NA", pp.TITLE: title.strip()}
+        self.submit("title", rec)
+
+    def submit_file(self, fname=None):
+        if not fname:
+            return
+        self.submit("file", fname)
+
+    def submit(self, kind, payload):
+        with self.lock:
+            self.active += 1
+            self.tasks.put((self.generation, kind, payload))
+
+    def cancel(self):
+        """
+        Drops queued tasks & stops current one after its in-flight request.
+        A "Cancelled" status always follows, straight away if nothing is running.
+        """
+        with self.lock:
+            self.generation += 1
+            if not self.active:
+                self.results.put(("status", "Cancelled"))
+
+    def cancelled(self, generation):
+        with self.lock:
+            return generation != self.generation
+
+    def run(self):
+        while True:
+            generation, kind, payload = self.tasks.get()
+            try:
+                self.process(generation, kind, payload)
+            except Exception as e:
+                self.results.put(("error", str(e)))
+            finally:
+                with self.lock:
+                    self.active -= 1
+                self.tasks.task_done()
+
+    def process(self, generation, kind, payload):
+        if self.cancelled(generation):
+            self.results.put(("status", "Cancelled"))
+            return
+        records = [payload] if kind == "title" else pp.extract_file(payload)
+        for idx, rec in enumerate(records):
+            if self.cancelled(generation):
+                self.results.put(("status", "Cancelled"))
+                return
+            self.results.put(("status", "Searching %d/%d: %s" % (idx + 1, len(records), rec[pp.TITLE])))
+            pp.throttle()
+            # in-flight search stops fetching pages as soon as cancel is pressed
+            results = pp.search(rec[pp.TITLE], self.engine, lambda: self.cancelled(generation))
+            matches = pp.score(rec, results)
+            if self.cancelled(generation):
+                self.results.put(("status", "Cancelled"))
+                return
+            for match in matches:
+                self.results.put(("match", match))
+        self.results.put(("status", "Done"))
 
 class Application(tk.Frame):
 
@@ -11,6 +102,7 @@ class Application(tk.Frame):
 
         #reference to the master widget, which is the tk window
         self.master = master
+        self.worker = SearchWorker()
 
         # bind event handlers
         self.master.bind('<Key>', lambda a : key_press(a))
@@ -27,9 +119,23 @@ class Application(tk.Frame):
         # screen text to display
         title = tk.Label(self.master, text = "Search for papers that may have been published").place(x=20, y=10)
 
-        # input
+        # input - each search/file is queued on the background worker
         search = tk.Label(self.master, text = "Search").place(x = 30, y = 50)
-        searchEntry = tk.Entry(self.master).place(x = 80, y = 50)
+        self.searchEntry = tk.Entry(self.master, width = 50)
+        self.searchEntry.place(x = 80, y = 50)
+        self.searchEntry.bind('<Return>', lambda a : self.search())
+        tk.Button(self.master, text = "Search", command = self.search).place(x = 500, y = 46)
+        tk.Button(self.master, text = "Cancel", command = self.cancel).place(x = 570, y = 46)
+
+        # results streamed in as they arrive
+        self.table = ttk.Treeview(self.master, columns = COLUMNS, show = "headings")
+        for col in COLUMNS:
+            self.table.heading(col, text = col)
+            self.table.column(col, width = 60 if col in ("direct", "partial", "confident") else 150)
+        self.table.place(x = 20, y = 90, width = 760, height = 360)
+
+        self.status = tk.Label(self.master, text = "Ready")
+        self.status.place(x = 20, y = 460)
 
         # allowing the widget to take the full space of the root window
         #label.pack(fill=tk.BOTH, expand=1)
@@ -41,6 +147,7 @@ class Application(tk.Frame):
         # create the file object)
         file = tk.Menu(menu) # adds a command to the menu option, calling it exit, and the
         # command it runs on event is client_exit
+        file.add_command(label="Open...", command=self.open_file)
         file.add_command(label="Exit", command=self.quit)
 
         #added "file" to our menu
@@ -56,6 +163,33 @@ class Application(tk.Frame):
         #added "file" to our menu
         menu.add_cascade(label="Edit", menu=edit)
 
+        self.master.after(POLL_MS, self.poll)
+
+    def search(self):
+        self.worker.submit_title(self.searchEntry.get())
+        self.searchEntry.delete(0, tk.END)
+
+    def open_file(self):
+        fname = filedialog.askopenfilename(filetypes = [("Manuscripts", "*.csv *.xlsx")])
+        self.worker.submit_file(fname)
+
+    def cancel(self):
+        self.worker.cancel()
+        self.status.config(text = "Cancelling...")
+
+    def poll(self):
+        """Drains worker messages on the UI thread then reschedules itself"""
+        try:
+            while True:
+                kind, payload = self.worker.results.get_nowait()
+                if kind == "match":
+                    self.table.insert("", tk.END, values = [payload[col] for col in COLUMNS])
+                else:
+                    self.status.config(text = payload)
+        except queue.Empty:
+            pass
+        self.master.after(POLL_MS, self.poll)
+
     def quit(self):
         exit()
 
@@ -79,6 +213,6 @@ def ctrl_w(event):
 if __name__ == "__main__":
     root = tk.Tk()
     # size of the window
-    root.geometry("400x300")
+    root.geometry("800x500")
     app = Application(root)
     root.mainloop()
@@ -26,16 +26,14 @@ import csv
 import os
 import re
 import sys
+import threading
 import time
+import unicodedata
 import urllib.parse
+from functools import lru_cache
 
-import requests
-import xlrd
-import xlsxwriter as xs
-from bs4 import BeautifulSoup
-from fuzzywuzzy import fuzz
-from rich.console import Console
-from rich.table import Table
+# heavy third party modules (requests, bs4, xlrd, xlsxwriter, rich, fuzzywuzzy)
+# are imported inside the functions needing them to keep CLI startup fast
 
 
 def print_restart(msg=None):
@@ -90,17 +88,82 @@ def err(msg=None):
     os.write(2, msg.encode())
 
 
+class SearchResult:
+    """
+    Compact search result record. Slotted with interned engine & host strings
+    so large batches stay small; description optionally truncated to
+    DESCRIPTION_MAX_CHARS.
+    """
+
+    __slots__ = (
+        "engine",
+        "host",
+        "path",
+        "search_title",
+        "page_title",
+        "page_authors",
+        "_description",
+    )
+    FIELDS = ("link", "search_title", "page_title", "description", "page_authors")
+
+    def __init__(
+        self,
+        engine="",
+        link="",
+        search_title="",
+        page_title="",
+        page_authors="",
+        description="",
+    ):
+        self.engine = sys.intern(engine)
+        # split off scheme & host (shared by most results) from unique path
+        url = urllib.parse.urlsplit(link)
+        host = url.scheme + "://" + url.netloc if url.netloc else ""
+        self.host = sys.intern(host)
+        self.path = link[len(host) :]
+        self.search_title = search_title
+        self.page_title = page_title
+        self.page_authors = page_authors
+        self.description = description
+
+    @property
+    def link(self):
+        return self.host + self.path
+
+    @property
+    def description(self):
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        if DESCRIPTION_MAX_CHARS and len(value) > DESCRIPTION_MAX_CHARS:
+            value = value[:DESCRIPTION_MAX_CHARS]
+        self._description = value
+
+    def as_dict(self):
+        """Returns key/value of link, titles, description and authors"""
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def __repr__(self):
+        return "SearchResult(%r, %r)" % (self.engine, self.link)
+
+
 def output_table(results=None, console=None, table=None, add_hdr=False):
     """Outputs rich table of resutls data to STDOUT"""
     if not results:
         return
 
-    if isinstance(results, dict):
+    from rich.console import Console
+    from rich.table import Table
+
+    if isinstance(results, (dict, SearchResult)):
         # load into list if only past single item (dictionary)
         temp = []
         temp.append(results)
         results = temp
 
+    results = [r.as_dict() if isinstance(r, SearchResult) else r for r in results]
+
     if not console:
         console = Console()
     if not table:
@@ -128,21 +191,151 @@ def is_valid_file(fname=None):
     return os.path.isfile(fname)
 
 
-def get_page(url=None):
-    """HTTP Get request to given URL returns response HTML payload string"""
-    result = None
+def get_session():
+    """Returns shared HTTP session so connections are pooled across requests"""
+    global SESSION
+    if SESSION is None:
+        import requests
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # desktop user-agent; expected by google in HTTP header
+        session.headers.update(
+            {"user-agent": USER_AGENT, "accept-encoding": accept_encoding()}
+        )
+        SESSION = session
+    return SESSION
+
+
+def accept_encoding():
+    """Compressed encodings to negotiate - brotli only if a decoder is installed"""
+    encodings = "gzip, deflate"
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return encodings + ", br"
+    return encodings
+
+
+def cache_entry(url=None):
+    """Returns cached entry for URL (even if expired) or None"""
     if not url:
-        return result
+        return None
+    with CACHE_LOCK:
+        return PAGE_CACHE.get(url)
+
+
+def cache_get(url=None):
+    """Returns cached response payload for URL if present and not expired"""
+    entry = cache_entry(url)
+    if not entry or time.time() - entry["ts"] > CACHE_TTL_SECS:
+        return None
+    return entry["content"]
+
 
-    # desktop user-agent; expected by google in HTTP header
-    headers = {"user-agent": USER_AGENT}
+def cache_put(url=None, content=None, etag=None, last_modified=None):
+    """
+    Stores response payload & its validators (ETag/Last-Modified) for URL
+    evicting oldest entries once over CACHE_MAX_BYTES (0 disables caching)
+    """
+    global CACHE_BYTES
+    if not url or content is None or len(content) > CACHE_MAX_BYTES:
+        return
+    with CACHE_LOCK:
+        old = PAGE_CACHE.pop(url, None)
+        if old:
+            CACHE_BYTES -= len(old["content"])
+        PAGE_CACHE[url] = {
+            "ts": time.time(),
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        CACHE_BYTES += len(content)
+        while CACHE_BYTES > CACHE_MAX_BYTES:
+            CACHE_BYTES -= len(PAGE_CACHE.pop(next(iter(PAGE_CACHE)))["content"])
+
+
+def cache_refresh(url=None, etag=None, last_modified=None):
+    """
+    Marks cached entry as fresh again (revalidated), updating its validators
+    when the 304 response carried new ones. Returns payload or None if evicted.
+    """
+    with CACHE_LOCK:
+        entry = PAGE_CACHE.get(url)
+        if not entry:
+            return None
+        entry["ts"] = time.time()
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+        return entry["content"]
+
+
+def throttle(secs=None):
+    """Blocks until at least secs have elapsed since previous throttled call"""
+    global LAST_THROTTLE
+    if secs is None:
+        secs = THROTTLE_SECS
+    with THROTTLE_LOCK:
+        wait = LAST_THROTTLE + secs - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        LAST_THROTTLE = time.monotonic()
+
+
+def fetch(url=None, headers=None):
+    """HTTP Get via shared session returning response or None on connection failure"""
     try:
-        resp = requests.get(url, headers=headers)
+        return get_session().get(url, headers=headers)
     except:  # noqa: E722
         e = sys.exc_info()[0]
         err("Failed connection: " + str(e) + " via URL " + url)
+        return None
+
+
+def get_page(url=None):
+    """HTTP Get request to given URL returns response HTML payload string"""
+    result = None
+    if not url:
+        return result
+
+    result = cache_get(url)
+    if result is not None:
+        return result
+
+    # expired entry - revalidate with server instead of re-downloading
+    headers = {}
+    entry = cache_entry(url)
+    if entry:
+        if entry["etag"]:
+            headers["if-none-match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["if-modified-since"] = entry["last_modified"]
+
+    resp = fetch(url, headers)
+    if resp is None:
         return result
 
+    # not modified - cached payload still valid
+    if resp.status_code == 304 and entry:
+        result = cache_refresh(
+            url, resp.headers.get("etag"), resp.headers.get("last-modified")
+        )
+        if result is not None:
+            return result
+        # entry evicted while revalidating - download full page instead
+        resp = fetch(url)
+        if resp is None:
+            return result
+
     # check if valid response
     if resp.status_code != 200:
         err(
@@ -154,13 +347,16 @@ def get_page(url=None):
         return result
 
     result = resp.content
+    cache_put(url, result, resp.headers.get("etag"), resp.headers.get("last-modified"))
     return result
 
 
-def pubmed_search(paper_title=None):
+def pubmed_search(paper_title=None, cancelled=None):
     """
     Applies a PubMed Central search for a given paper title
-    returning list of results key/value of link, title, description
+    returning list of SearchResult of link, title, description, or None if
+    the search request failed. Optional cancelled callable is checked before
+    each article fetch.
     """
     results = []
 
@@ -182,7 +378,9 @@ def pubmed_search(paper_title=None):
 
     response = get_page(url)
     if not response:
-        return results
+        return None  # request failed - distinct from a search with no hits
+
+    from bs4 import BeautifulSoup
 
     # parse HTTP response and pull out search results
     soup = BeautifulSoup(response, "html.parser")
@@ -194,6 +392,8 @@ def pubmed_search(paper_title=None):
     divs = soup.find_all("div", class_="rslt")
 
     for r in divs:
+        if cancelled and cancelled():
+            break
         count += 1
         title = r.find("div", class_="title")
         anchors = title.find_all("a")
@@ -236,13 +436,9 @@ def pubmed_search(paper_title=None):
                     ):
                         page_authors = meta.attrs["content"]
 
-        item = {
-            "link": link,
-            "search_title": search_title,
-            "page_title": page_title,
-            "description": description,
-            "page_authors": page_authors,
-        }
+        item = SearchResult(
+            "PMC", link, search_title, page_title, page_authors, description
+        )
         results.append(item)
         print_restart("Results Appended to List")
         # output_table(item)
@@ -253,7 +449,8 @@ def pubmed_search(paper_title=None):
 def google_search(paper_title=None):
     """
     Applies a google search for a given paper title
-    returning list of results key/value of link, title, description
+    returning list of SearchResult of link, title, description,
+    or None if the search request failed
     """
     GOOGLE_SEARCH_URL
     results = []
@@ -269,7 +466,9 @@ def google_search(paper_title=None):
 
     response = get_page(url)
     if not response:
-        return results
+        return None  # request failed - distinct from a search with no hits
+
+    from bs4 import BeautifulSoup
 
     # parse HTTP response and pull out search results
     soup = BeautifulSoup(response, "html.parser")
@@ -294,13 +493,9 @@ def google_search(paper_title=None):
             description = spans[0].text
             page_title = ""
             page_authors = ""
-            item = {
-                "link": link,
-                "search_title": search_title,
-                "page_title": page_title,
-                "page_authors": page_authors,
-                "description": description,
-            }
+            item = SearchResult(
+                "GOOGLE", link, search_title, page_title, page_authors, description
+            )
             results.append(item)
             print_restart("Results Appended to List")
             # output_table(item)
@@ -318,6 +513,8 @@ def extract_xlsx(fname=None, search_hdrs=None):
         err("Invalid CSV extraction for filename and column headers")
         return results
 
+    import xlrd
+
     # extract corresponding data rows to columns for specific headers
     wb = xlrd.open_workbook(fname)
     ws = wb.sheet_by_index(0)
@@ -367,6 +564,351 @@ def extract_csv(fname=None, search_hdrs=None):
     return results
 
 
+def search(paper_title=None, engine="ALL", cancelled=None):
+    """
+    Runs requested search engine(s) for a given paper title
+    returning combined list of SearchResult of link, title, description,
+    or None if every requested engine's search request failed.
+    Optional cancelled callable returning True stops further requests.
+    """
+    results = []
+
+    if not paper_title:
+        return results
+
+    found = []
+    if engine == "ALL" or engine == "PMC":
+        found.append(pubmed_search(paper_title, cancelled))
+
+    if not (cancelled and cancelled()):
+        if engine == "ALL" or engine == "GOOGLE":
+            found.append(google_search(paper_title))
+
+    if found and all(f is None for f in found):
+        return None
+    for f in found:
+        results.extend(f or [])
+    return results
+
+
+def normalize_title(title=None):
+    """Collapses whitespace & drops double quotes so title is safe in a phrase query"""
+    if not title:
+        return ""
+    return " ".join(title.replace('"', " ").split())
+
+
+def coalesce_query(titles=None, engine="PMC"):
+    """Returns single boolean OR search query for given titles"""
+    if not titles:
+        return ""
+    field = "[Title]" if engine == "PMC" else ""
+    return " OR ".join('"' + normalize_title(t) + '"' + field for t in titles)
+
+
+def attribute(titles=None, results=None):
+    """
+    Splits results of a coalesced query back to the title each best matches.
+    Returns tuple of {title: results} and set of titles with ambiguous hits.
+    """
+    attributed = {title: [] for title in titles or []}
+    ambiguous = set()
+
+    if not titles or not results:
+        return attributed, ambiguous
+
+    from fuzzywuzzy import fuzz
+
+    for result in results:
+        candidate = result.page_title or result.search_title
+        scores = sorted(
+            ((fuzz.partial_ratio(title, candidate), title) for title in titles),
+            reverse=True,
+        )
+        best, title = scores[0]
+        if best < MIN_PARTIAL_MATCH:
+            continue  # matches none of the titles well
+        if len(scores) > 1 and best - scores[1][0] < COALESCE_MARGIN:
+            ambiguous.update(t for s, t in scores if best - s < COALESCE_MARGIN)
+            continue
+        attributed[title].append(result)
+
+    return attributed, ambiguous
+
+
+def coalesced_search(titles=None, engine="ALL"):
+    """
+    Searches a group of titles with one OR query per engine, attributing hits
+    back to each title. Falls back to per-title queries when the coalesced
+    request failed or found nothing, the result page was full (hits may be
+    missing) or hits could not be told apart.
+    Returns {title: results}.
+    """
+    found = {title: [] for title in titles or []}
+
+    if not titles:
+        return found
+
+    engines = ["PMC", "GOOGLE"] if engine == "ALL" else [engine]
+    for eng in engines:
+        fallback = titles
+        if len(titles) > 1:
+            throttle()
+            results = search(coalesce_query(titles, eng), eng)
+            # failed request, no hits (PMC redirects a lone hit to the
+            # article page) or a full page all need per-title queries
+            if results and len(results) < RESULTS_PER_PAGE[eng]:
+                attributed, ambiguous = attribute(titles, results)
+                fallback = [t for t in titles if t in ambiguous]
+                for title in titles:
+                    if title not in ambiguous:
+                        found[title].extend(attributed[title])
+
+        for title in fallback:
+            throttle()
+            found[title].extend(search(title, eng) or [])
+
+    return found
+
+
+def batch_search(records=None, engine="ALL", max_len=0):
+    """
+    Yields (search record, results) for each record, rate limited. If max_len is
+    set titles are coalesced into OR queries of up to max_len characters.
+    """
+    if not records:
+        return
+
+    if not max_len:
+        for rec in records:
+            throttle()  # avoid being blocked by google or PMC - rate limit calls
+            yield rec, search(rec[TITLE], engine) or []
+        return
+
+    # group consecutive records so results are still yielded in input order
+    group = []
+    for rec in records + [None]:
+        if rec is not None:
+            titles = list(dict.fromkeys([r[TITLE] for r in group] + [rec[TITLE]]))
+            if not group or len(coalesce_query(titles)) <= max_len:
+                group.append(rec)
+                continue
+        found = coalesced_search(list(dict.fromkeys(r[TITLE] for r in group)), engine)
+        for grouped in group:
+            yield grouped, found[grouped[TITLE]]
+        group = [rec]
+
+
+def is_initials(word=None):
+    """Initials are single letters or short all caps words (e.g. "J", "JE")"""
+    return len(word) == 1 or (len(word) <= 2 and word.isupper())
+
+
+def name_words(name=None):
+    """
+    Returns lowercase name words of a single author name leaving out
+    initials, particles (e.g. "van", "de") and filler such as "et al."
+    """
+    if not name:
+        return []
+    return [
+        w.lower()
+        for w in re.findall(r"[^\W\d_]+(?:[-'][^\W\d_]+)*", name)
+        if not is_initials(w)
+        and w.lower() not in AUTHOR_FILLER_WORDS
+        and w.lower() not in AUTHOR_PARTICLES
+    ]
+
+
+def surname(name=None):
+    """
+    Returns lowercase surname of a single author name: the last name word
+    before the comma in "Last, First", before trailing initials in "Last FI"
+    and of the whole name in "First Last" (so "de la Cruz J" and "Juan de la
+    Cruz" are both "cruz"). Returns None if name has no surname (e.g. "et al.").
+    """
+    if not name:
+        return None
+    words = name_words(name.split(",")[0])
+    return words[-1] if words else None
+
+
+def split_authors(names=None):
+    """
+    Splits accent-free author list into single author names. Authors are
+    separated by ";" or, failing that, by ","; a comma list alternating
+    single word surnames and given names ("Smith, John, Doe, Jane") is paired
+    up as "Last, First" authors. Compound surnames in such lists need ";".
+    """
+    names = unicodedata.normalize("NFKD", names)
+    names = "".join(c for c in names if not unicodedata.combining(c))
+    names = re.sub(r"\s+(?:and|&)\s+", ";" if ";" in names else ",", names)
+
+    if ";" in names:
+        return names.split(";")
+
+    authors = names.split(",")
+    if len(authors) % 2 == 0 and all(len(a.split()) == 1 for a in authors[::2]):
+        authors = [
+            last + "," + first for last, first in zip(authors[::2], authors[1::2])
+        ]
+    return authors
+
+
+@lru_cache(maxsize=4096)
+def author_surnames(names=None):
+    """
+    Splits author list into one accent-free surname per author. Accepts
+    "Last, First; ...", "First Last, First Last and ..." and "Last FI, ..."
+    styles; filler such as "et al." is dropped.
+    """
+    if not names or names == "NA":
+        return frozenset()
+    surnames = (surname(author) for author in split_authors(names))
+    return frozenset(s for s in surnames if s)
+
+
+@lru_cache(maxsize=4096)
+def author_words(names=None):
+    """Returns all accent-free name words (given names and surnames) of author list"""
+    if not names or names == "NA":
+        return frozenset()
+    return frozenset(w for author in split_authors(names) for w in name_words(author))
+
+
+def author_overlap(rec_surnames=None, page_authors=None):
+    """
+    Returns number of distinct authors (by surname) shared between manuscript
+    and candidate, or None when either side has no authors to compare
+    (e.g. Google results)
+    """
+    page_surnames = author_surnames(page_authors)
+    if not rec_surnames or not page_surnames:
+        return None
+    return len(rec_surnames & page_surnames)
+
+
+def score(rec=None, results=None):
+    """
+    Applies direct and partial fuzzy match of a search record's title against
+    each result's page title. Returns list of matches (output rows) meeting
+    the minimum partial match score.
+
+    Candidates with known authors sharing no name word with the manuscript's
+    are dropped before title scoring; strong author (surname) overlap plus a
+    good title score marks the match as confident.
+    """
+    matches = []
+
+    if not rec or not results:
+        return matches
+
+    from fuzzywuzzy import fuzz
+
+    rec_words = author_words(rec.get(AUTHORS))
+    rec_surnames = author_surnames(rec.get(AUTHORS))
+    confident_overlap = min(CONFIDENT_AUTHOR_OVERLAP, len(rec_surnames))
+
+    # score on tight array of page titles; identical titles scored once
+    titles = [result.page_title for result in results]
+    scores = {}
+
+    for title, result in zip(titles, results):
+        if rec[TITLE] in result.search_title is False:
+            continue
+
+        # cheap author set intersection before expensive title scoring
+        page_words = author_words(result.page_authors)
+        if rec_words and page_words and not rec_words & page_words:
+            continue
+        overlap = author_overlap(rec_surnames, result.page_authors)
+
+        # validate actual page's title vs. input seach
+        if title not in scores:
+            scores[title] = (
+                fuzz.ratio(rec[TITLE], title),
+                fuzz.partial_ratio(rec[TITLE], title),
+            )
+        direct, partial = scores[title]
+
+        # ignore search results with poor mathes
+        if partial < MIN_PARTIAL_MATCH:
+            continue
+
+        match = {
+            ID: rec.get(ID, "NA"),
+            TITLE: rec[TITLE],
+            AUTHORS: rec.get(AUTHORS, "NA"),
+            "search_title": result.search_title,
+            "page_title": title,
+            "page_authors": result.page_authors,
+            TYPE: rec.get(TYPE, "NA"),
+            EDITOR: rec.get(EDITOR, ""),
+            "direct": direct,
+            "partial": partial,
+            "link": result.link,
+            "description": result.description,
+            "engine": result.engine,
+            "author_overlap": overlap or 0,
+            "confident": bool(
+                overlap
+                and overlap >= confident_overlap
+                and partial >= CONFIDENT_PARTIAL_MATCH
+            ),
+        }
+        matches.append(match)
+
+    return matches
+
+
+def write_xlsx_header(ws=None, fmt=None):
+    """Writes column headers to first row of the results worksheet"""
+    if ws is None:
+        return
+    for col, hdr in enumerate(XLSX_HDRS):
+        ws.write(0, col, hdr, fmt)
+
+
+def write_xlsx_row(ws=None, row=None, match=None):
+    """Writes a single match (output of score) to given worksheet row"""
+    if ws is None or row is None or not match:
+        return
+    ws.write(row, 0, match[ID])
+    ws.write(row, 1, match[TITLE])
+    ws.write(row, 2, match[AUTHORS])
+    ws.write(row, 3, match["search_title"])
+    ws.write(row, 4, match["page_title"])
+    ws.write(row, 5, match["page_authors"])
+    ws.write(row, 6, match[TYPE])
+    ws.write(row, 7, match["direct"])
+    ws.write(row, 8, match["partial"])
+    ws.write_url(row, 9, match["link"], string=match["link"])
+    ws.write(row, 10, match["description"])
+    ws.write(row, 11, match["author_overlap"])
+    ws.write(row, 12, "Y" if match["confident"] else "N")
+
+
+def extract_file(fname=None):
+    """
+    Validates and reads input file (CSV or XLSX) returning list of search records.
+    Raises ValueError if file cannot be processed.
+    """
+    if not is_valid_file(fname):
+        raise ValueError("Invalid file - unable to process: " + str(fname))
+    if fname.endswith(".csv"):
+        return extract_csv(fname, FILE_SEARCH_HDRS)
+    if fname.endswith(".xlsx"):
+        return extract_xlsx(fname, FILE_SEARCH_HDRS)
+    raise ValueError("Unsupport file type - cannot convert: " + fname)
+
+
+def output_filename(ts=None):
+    """Returns results XLSX filename named after (current) timestamp"""
+    if ts is None:
+        ts = calendar.timegm(time.gmtime())
+    return "paper-published-" + str(ts) + ".xlsx"
+
+
 # ----------------------------------------------------------------------
 # M A I N  L O G I C
 # ----------------------------------------------------------------------
@@ -389,6 +931,11 @@ def main():
         action="store",
         help="Individual paper title or term to search on",
     )
+    group.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as long-lived local HTTP service (see pp_server.py)",
+    )
     parser.add_argument(
         "-e",
         "--engine",
@@ -396,147 +943,127 @@ def main():
         help="Search Engines to query " + ", ".join(VALID_SEARCH_ENGINES),
         default="ALL",
     )
+    parser.add_argument(
+        "--host",
+        action="store",
+        help="Service mode address to bind to",
+        default=SERVER_HOST,
+    )
+    parser.add_argument(
+        "--port",
+        action="store",
+        type=int,
+        help="Service mode port to listen on",
+        default=SERVER_PORT,
+    )
+    parser.add_argument(
+        "-c",
+        "--coalesce",
+        action="store",
+        type=int,
+        nargs="?",
+        const=MAX_QUERY_LEN,
+        default=0,
+        help="Combine titles into OR search queries of up to COALESCE characters "
+        + "(default "
+        + str(MAX_QUERY_LEN)
+        + ")",
+    )
+    parser.add_argument(
+        "--max-description",
+        action="store",
+        type=int,
+        default=0,
+        help="Truncate result descriptions to MAX_DESCRIPTION characters to save memory",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store",
+        help="Also append results to Parquet dataset directory (requires pyarrow)",
+    )
     args = parser.parse_args()
 
+    global DESCRIPTION_MAX_CHARS
+    DESCRIPTION_MAX_CHARS = args.max_description
+
     search_records = []
 
+    engine = "ALL"
+    if args.engine:
+        if not is_valid_engine(args.engine):
+            err("Invalid search engine requested: " + args.engine)
+            sys.exit(3)
+        else:
+            engine = args.engine.upper()
+
+    if args.serve:
+        # batch only options; service lookups are scored one title at a time
+        if args.coalesce or args.parquet:
+            err("--coalesce and --parquet are not supported with --serve")
+            sys.exit(5)
+
+        # pp_server imports its own copy of pp (this script runs as __main__)
+        # so settings are passed explicitly rather than via module globals
+        import pp_server
+
+        pp_server.serve(args.host, args.port, engine, args.max_description)
+        sys.exit(0)
+
+    if args.parquet:
+        import pp_store
+
+        if not pp_store.available():
+            err("Parquet output requires pyarrow - pip3 install pyarrow")
+            sys.exit(4)
+
     if args.file:
         if not is_valid_file(args.file):
             err("Invalid file - unable to process: " + args.file)
             sys.exit(1)
-        if args.file.endswith(".csv"):
-            data = extract_csv(args.file, FILE_SEARCH_HDRS)
-        elif args.file.endswith(".xlsx"):
-            data = extract_xlsx(args.file, FILE_SEARCH_HDRS)
-        else:
-            err("Unsupport file type - cannot convert: " + args.file)
+        try:
+            search_records = extract_file(args.file)
+        except ValueError as e:
+            err(str(e))
             sys.exit(2)
-        search_records = data
 
     if args.search:
         item = {ID: "NA", AUTHORS: "NA", TYPE: "NA", TITLE: args.search}
         search_records.append(item)
 
-    engine = "ALL"
-    if args.engine:
-        if not is_valid_engine(args.engine):
-            err("Invalid search engine requested: " + args.engine)
-            sys.exit(3)
-        else:
-            engine = args.engine.upper()
+    import xlsxwriter as xs
+    from rich.console import Console
+    from rich.table import Table
 
     # search on title - only initial top 10 results from Google
-    hdr_shown = False
-    results = []
-
     # output results to XLSX file named current timestamp
     ts = calendar.timegm(time.gmtime())
-    wb = xs.Workbook("paper-published-" + str(ts) + ".xlsx")
+    wb = xs.Workbook(output_filename(ts))
     ws = wb.add_worksheet()
     # Add a bold format to use to highlight cells.
     bold = wb.add_format({"bold": True})
+    write_xlsx_header(ws, bold)
     row = 0
+    run_matches = []
 
-    for rec in search_records:
-        if engine == "ALL" or engine == "PMC":
-            temp = pubmed_search(rec[TITLE])
-            results.extend(temp)
-
-        if engine == "ALL" or engine == "GOOGLE":
-            temp = google_search(rec[TITLE])
-            results.extend(temp)
-
-        time.sleep(
-            THROTTLE_SECS
-        )  # avoid being blocked by google or PMC - rate limit calls
-
+    # results kept per record only so memory stays flat on large batches
+    for rec, results in batch_search(search_records, engine, args.coalesce):
         # Rich STDOUT
         console = Console()
         table = Table(show_header=True, header_style="bold magenta")
         output_table(results, console, table, True)
 
         # check direct or partial ratio match on title
-        for result in results:
-            if rec[TITLE] in result["search_title"] is False:
-                continue
-
-            # validate actual page's title vs. input seach
-            direct = fuzz.ratio(rec[TITLE], result["page_title"])
-            partial = fuzz.partial_ratio(rec[TITLE], result["page_title"])
-
-            # output results
-            if not hdr_shown:
-                """
-                print(
-                    "Paper ID,",
-                    "Paper Title,",
-                    "Paper Authors, ",
-                    "Search Title,",
-                    "Result Page Title",
-                    "Result Page Authors",
-                    "MS Type, ",
-                    "Direct Match,",
-                    "Partial Match,",
-                    "Link, ",
-                    "Description",
-                )
-                """
-
-                # Excel Worksheet
-                ws.write(row, 0, "Paper ID", bold)
-                ws.write(row, 1, "Paper Title", bold)
-                ws.write(row, 2, "Paper Authors", bold)
-                ws.write(row, 3, "Search Title", bold)
-                ws.write(row, 4, "Result Page Title", bold)
-                ws.write(row, 5, "Result Page Authors", bold)
-                ws.write(row, 6, "MS Type", bold)
-                ws.write(row, 7, "Direct Match", bold)
-                ws.write(row, 8, "Partial Match", bold)
-                ws.write(row, 9, "Link", bold)
-                ws.write(row, 10, "Description", bold)
-                hdr_shown = True
-
-            # ignore search results with poor mathes
-            if partial < 60:
-                continue
-
-            # rich output to STDOUT
-            # output_table(result, console, table)
-
-            """
-            print(
-                '%s,"%s","%s","%s","%s","%s","%s",%.2f,%.2f,%s,%s'
-                % (
-                    rec[ID],
-                    rec[TITLE],
-                    rec[AUTHORS],
-                    result["search_title"],
-                    result["page_title"],
-                    result["page_authors"],
-                    rec[TYPE],
-                    direct,
-                    partial,
-                    result["link"],
-                    result["description"],
-                )
-            )
-            """
-
+        for match in score(rec, results):
             row += 1
-            ws.write(row, 0, rec[ID])
-            ws.write(row, 1, rec[TITLE])
-            ws.write(row, 2, rec[AUTHORS])
-            ws.write(row, 3, result["search_title"])
-            ws.write(row, 4, result["page_title"])
-            ws.write(row, 5, result["page_authors"])
-            ws.write(row, 6, rec[TYPE])
-            ws.write(row, 7, direct)
-            ws.write(row, 8, partial)
-            ws.write_url(row, 9, result["link"], string=result["link"])
-            ws.write(row, 10, result["description"])
+            write_xlsx_row(ws, row, match)
+            if args.parquet:
+                run_matches.append(match)
 
     wb.close()
 
+    if args.parquet:
+        pp_store.append(args.parquet, run_matches, ts)
+
     sys.exit(0)
 
 
@@ -553,8 +1080,48 @@ ID = "Manuscript ID"
 TITLE = "Manuscript Title"
 AUTHORS = "Author Names"
 TYPE = "Manuscript Type"
-FILE_SEARCH_HDRS = [ID, TITLE, AUTHORS, TYPE]
+EDITOR = "Editor Full Name"  # optional input column
+FILE_SEARCH_HDRS = [ID, TITLE, AUTHORS, TYPE, EDITOR]
 THROTTLE_SECS = 1
+MIN_PARTIAL_MATCH = 60
+XLSX_HDRS = [
+    "Paper ID",
+    "Paper Title",
+    "Paper Authors",
+    "Search Title",
+    "Result Page Title",
+    "Result Page Authors",
+    "MS Type",
+    "Direct Match",
+    "Partial Match",
+    "Link",
+    "Description",
+    "Author Overlap",
+    "Confident Match",
+]
+CONFIDENT_AUTHOR_OVERLAP = 2  # shared authors (fewer if input lists fewer)
+AUTHOR_FILLER_WORDS = frozenset(["et", "al", "and", "others", "jr", "sr", "phd", "md"])
+AUTHOR_PARTICLES = frozenset(["van", "von", "de", "da", "del", "der", "la", "le", "di"])
+CONFIDENT_PARTIAL_MATCH = 80
+MAX_QUERY_LEN = 500
+COALESCE_MARGIN = 10  # min fuzzy score lead to attribute a coalesced hit to a title
+RESULTS_PER_PAGE = {"PMC": 20, "GOOGLE": 10}
+DESCRIPTION_MAX_CHARS = 0  # 0 keeps full description text (see --max-description)
+POOL_SIZE = 10
+CACHE_TTL_SECS = 3600
+CACHE_MAX_BYTES = 0  # page cache off for one-shot CLI runs; service mode enables
+SERVER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_MAX_FINISHED_JOBS = 50  # finished jobs (with matches) kept for polling
+
+# shared state kept warm across requests (see get_session, get_page & throttle)
+SESSION = None
+PAGE_CACHE = {}
+CACHE_BYTES = 0
+CACHE_LOCK = threading.Lock()
+THROTTLE_LOCK = threading.Lock()
+LAST_THROTTLE = 0.0
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ********************************************************
+# Sharded batch execution via a shared SQLite work queue.
+#
+# A coordinator loads the input file into a queue database
+# (e.g. on shared storage), any number of workers on one or
+# more hosts claim records under a time limited lease, search
+# and score them and write matches back. Expired leases are
+# reclaimed by other workers. Merge writes the usual
+# paper-published-<ts>.xlsx once all records are done.
+#
+# python3 pp_queue.py init -f <input-file> [--db <queue-db>]
+# python3 pp_queue.py work [--db <queue-db>] [-e <engine>]
+# python3 pp_queue.py status [--db <queue-db>]
+# python3 pp_queue.py merge [--db <queue-db>]
+# ********************************************************
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+import pp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS matches (
+    record_id INTEGER NOT NULL REFERENCES records(id),
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (record_id, seq)
+);
+"""
+
+
+def connect(db=None):
+    """Opens queue database creating schema if needed"""
+    if db is None:
+        db = QUEUE_DB
+    # autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(db, timeout=BUSY_TIMEOUT_SECS, isolation_level=None)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def worker_id():
+    """Unique worker name across hosts sharing the queue"""
+    return socket.gethostname() + ":" + str(os.getpid())
+
+
+def load(conn=None, records=None):
+    """Adds search records to the queue returning number loaded"""
+    if conn is None or not records:
+        return 0
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(
+        "INSERT INTO records (data) VALUES (?)",
+        [(json.dumps(rec),) for rec in records],
+    )
+    conn.execute("COMMIT")
+    return len(records)
+
+
+def claim(conn=None, owner=None, lease_secs=None):
+    """
+    Leases next pending (or expired lease) record to owner.
+    Returns tuple of record id and search record or None if queue drained.
+    """
+    if conn is None or not owner:
+        return None
+    if lease_secs is None:
+        lease_secs = LEASE_SECS
+
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # give up on records whose workers keep dying or timing out
+        conn.execute(
+            "UPDATE records SET state = 'failed', error = 'Lease expired'"
+            " WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, MAX_ATTEMPTS),
+        )
+        row = conn.execute(
+            "SELECT id, data FROM records"
+            " WHERE attempts < ?"
+            " AND (state = 'pending' OR (state = 'leased' AND lease_expires < ?))"
+            " ORDER BY id LIMIT 1",
+            (MAX_ATTEMPTS, now),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE records SET state = 'leased', owner = ?, lease_expires = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (owner, now + lease_secs, row[0]),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    if not row:
+        return None
+    return row[0], json.loads(row[1])
+
+
+def complete(conn=None, record_id=None, owner=None, matches=None, error=None):
+    """
+    Stores scored matches (or error) for a leased record.
+    Returns False if the lease was lost to another worker.
+    """
+    if conn is None or record_id is None:
+        return False
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cur = conn.execute(
+            "UPDATE records SET state = ?, error = ?, lease_expires = NULL"
+            " WHERE id = ? AND owner = ? AND state = 'leased'",
+            ("failed" if error else "done", error, record_id, owner),
+        )
+        if cur.rowcount == 1:
+            conn.execute("DELETE FROM matches WHERE record_id = ?", (record_id,))
+            conn.executemany(
+                "INSERT INTO matches (record_id, seq, data) VALUES (?, ?, ?)",
+                [
+                    (record_id, seq, json.dumps(match))
+                    for seq, match in enumerate(matches or [])
+                ],
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return cur.rowcount == 1
+
+
+def outstanding(conn=None):
+    """Returns number of records not yet done or failed (pending or leased)"""
+    if conn is None:
+        return 0
+    row = conn.execute(
+        "SELECT COUNT(*) FROM records WHERE state IN ('pending', 'leased')"
+    ).fetchone()
+    return row[0]
+
+
+def work(db=None, engine="ALL", lease_secs=None):
+    """
+    Claims and processes records returning count processed. Keeps polling while
+    other workers hold leases so records of crashed workers are retried once
+    their lease expires; exits when every record is done or failed.
+    """
+    conn = connect(db)
+    owner = worker_id()
+    count = 0
+    try:
+        while True:
+            claimed = claim(conn, owner, lease_secs)
+            if not claimed:
+                if not outstanding(conn):
+                    break
+                time.sleep(POLL_SECS)
+                continue
+            record_id, rec = claimed
+            pp.throttle()  # per worker rate limit
+            try:
+                matches = pp.score(rec, pp.search(rec[pp.TITLE], engine))
+            except Exception as e:
+                complete(conn, record_id, owner, error=str(e) or type(e).__name__)
+                continue
+            if complete(conn, record_id, owner, matches):
+                count += 1
+    finally:
+        conn.close()
+    return count
+
+
+def status(conn=None):
+    """Returns count of records per state"""
+    if conn is None:
+        return {}
+    rows = conn.execute("SELECT state, COUNT(*) FROM records GROUP BY state")
+    return dict(rows.fetchall())
+
+
+def merge(conn=None, fname=None):
+    """
+    Writes matches of all done records in input order to XLSX file.
+    Returns number of match rows written.
+    """
+    if conn is None or not fname:
+        return 0
+
+    import xlsxwriter as xs
+
+    wb = xs.Workbook(fname)
+    ws = wb.add_worksheet()
+    pp.write_xlsx_header(ws, wb.add_format({"bold": True}))
+    row = 0
+    rows = conn.execute(
+        "SELECT m.data FROM matches m JOIN records r ON r.id = m.record_id"
+        " WHERE r.state = 'done' ORDER BY m.record_id, m.seq"
+    )
+    for (data,) in rows:
+        row += 1
+        pp.write_xlsx_row(ws, row, json.loads(data))
+    wb.close()
+    return row
+
+
+# ----------------------------------------------------------------------
+# M A I N  L O G I C
+# ----------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser("Sharded paper published batch via work queue")
+    parser.add_argument("command", choices=["init", "work", "status", "merge"])
+    parser.add_argument(
+        "--db", action="store", help="Shared queue database file", default=QUEUE_DB
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        action="store",
+        help="Input file to load (init) - CSV or XLST supported",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        action="store",
+        help="Search Engines to query " + ", ".join(pp.VALID_SEARCH_ENGINES),
+        default="ALL",
+    )
+    parser.add_argument(
+        "--lease",
+        action="store",
+        type=float,
+        help="Seconds a claimed record is leased before other workers retry it",
+        default=LEASE_SECS,
+    )
+    args = parser.parse_args()
+
+    if not pp.is_valid_engine(args.engine):
+        pp.err("Invalid search engine requested: " + args.engine)
+        sys.exit(3)
+
+    if args.command == "init":
+        try:
+            records = pp.extract_file(args.file)
+        except ValueError as e:
+            pp.err(str(e))
+            sys.exit(2)
+        conn = connect(args.db)
+        print("Loaded " + str(load(conn, records)) + " records into " + args.db)
+    elif args.command == "work":
+        count = work(args.db, args.engine.upper(), args.lease)
+        print("Processed " + str(count) + " records")
+    elif args.command == "status":
+        conn = connect(args.db)
+        for state, count in sorted(status(conn).items()):
+            print(state + ": " + str(count))
+    elif args.command == "merge":
+        conn = connect(args.db)
+        states = status(conn)
+        if set(states) - {"done", "failed"}:
+            pp.err("Warning - queue not drained, merging done records only")
+        fname = pp.output_filename()
+        print("Wrote " + str(merge(conn, fname)) + " matches to " + fname)
+
+    sys.exit(0)
+
+
+# ==========================
+# Global Variables
+# ==========================
+QUEUE_DB = "paper-published-queue.db"
+LEASE_SECS = 300
+MAX_ATTEMPTS = 3
+POLL_SECS = 5  # wait between claims while other workers hold leases
+BUSY_TIMEOUT_SECS = 60
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
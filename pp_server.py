@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ********************************************************
+# Long-running service mode for paper published.
+#
+# Keeps a single process (and its pooled HTTP connections,
+# page cache and rate limiter) warm across requests and
+# exposes a local HTTP JSON API:
+#
+#   GET  /search?title=<title>[&engine=PMC]  synchronous lookup
+#   POST /jobs  {"file": <path>, "engine": <engine>}  queue batch file
+#   GET  /jobs  list of queued/running/finished jobs
+#   GET  /jobs/<id>  job status, output XLSX and matches
+#
+# python3 pp_server.py [--host <host>] [--port <port>] [-e <engine>]
+# or
+# python3 pp.py --serve [--host <host>] [--port <port>] [--max-description <len>]
+# ********************************************************
+
+import argparse
+import itertools
+import json
+import queue
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pp
+
+
+class JobQueue:
+    """Batch file jobs processed in order by a single background worker"""
+
+    def __init__(self, engine="ALL"):
+        self.engine = engine
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.ids = itertools.count(1)
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, fname=None, engine=None):
+        """Queues batch file for processing returning the new job"""
+        job = {
+            "id": next(self.ids),
+            "status": "queued",
+            "file": fname,
+            "engine": engine or self.engine,
+            "processed": 0,
+            "total": 0,
+            "output": None,
+            "error": None,
+            "matches": [],
+        }
+        with self.lock:
+            self.jobs[job["id"]] = job
+        self.pending.put(job["id"])
+        return job
+
+    def get(self, job_id=None):
+        """Returns snapshot copy of job or None if unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job, matches=list(job["matches"])) if job else None
+
+    def list(self):
+        """Returns job summaries (without matches) in submission order"""
+        with self.lock:
+            return [
+                {k: v for k, v in job.items() if k != "matches"}
+                for job in self.jobs.values()
+            ]
+
+    def update(self, job_id=None, **kwargs):
+        with self.lock:
+            self.jobs[job_id].update(kwargs)
+
+    def run(self):
+        while True:
+            job_id = self.pending.get()
+            try:
+                self.process(job_id)
+            except Exception as e:
+                self.update(job_id, status="failed", error=str(e))
+            finally:
+                self.prune()
+                self.pending.task_done()
+
+    def prune(self):
+        """Forgets oldest finished jobs beyond pp.SERVER_MAX_FINISHED_JOBS"""
+        with self.lock:
+            finished = [
+                job_id
+                for job_id, job in self.jobs.items()
+                if job["status"] in ("done", "failed")
+            ]
+            excess = len(finished) - pp.SERVER_MAX_FINISHED_JOBS
+            for job_id in finished[: max(0, excess)]:
+                del self.jobs[job_id]
+
+    def process(self, job_id=None):
+        job = self.get(job_id)
+        records = pp.extract_file(job["file"])
+        self.update(job_id, status="running", total=len(records))
+
+        import xlsxwriter as xs
+
+        fname = pp.output_filename()
+        wb = xs.Workbook(fname)
+        ws = wb.add_worksheet()
+        pp.write_xlsx_header(ws, wb.add_format({"bold": True}))
+        row = 0
+        try:
+            for idx, rec in enumerate(records):
+                matches = lookup(rec, job["engine"])
+                for match in matches:
+                    row += 1
+                    pp.write_xlsx_row(ws, row, match)
+                with self.lock:
+                    self.jobs[job_id]["matches"].extend(matches)
+                    self.jobs[job_id]["processed"] = idx + 1
+        finally:
+            wb.close()
+        self.update(job_id, status="done", output=fname)
+
+
+def lookup(rec=None, engine="ALL"):
+    """Throttled search & score of a single search record"""
+    pp.throttle()
+    return pp.score(rec, pp.search(rec[pp.TITLE], engine))
+
+
+class Handler(BaseHTTPRequestHandler):
+    """HTTP JSON API - server attributes engine & jobs set by make_server"""
+
+    def send_json(self, status=200, payload=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_engine(self, engine=None):
+        if not engine:
+            return self.server.engine
+        if not pp.is_valid_engine(engine):
+            return None
+        return engine.upper()
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["search"]:
+            title = params.get("title", [""])[0].strip()
+            engine = self.get_engine(params.get("engine", [None])[0])
+            if not title:
+                return self.send_json(400, {"error": "Missing title"})
+            if not engine:
+                return self.send_json(400, {"error": "Invalid search engine"})
+            rec = {pp.ID: "NA", pp.AUTHORS: "NA", pp.TYPE: "NA", pp.TITLE: title}
+            return self.send_json(200, {"matches": lookup(rec, engine)})
+
+        if parts == ["jobs"]:
+            return self.send_json(200, {"jobs": self.server.jobs.list()})
+
+        if len(parts) == 2 and parts[0] == "jobs" and parts[1].isdigit():
+            job = self.server.jobs.get(int(parts[1]))
+            if not job:
+                return self.send_json(404, {"error": "Unknown job"})
+            return self.send_json(200, job)
+
+        self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self.send_json(404, {"error": "Not found"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self.send_json(400, {"error": "Invalid JSON body"})
+
+        fname = data.get("file")
+        engine = self.get_engine(data.get("engine"))
+        if not pp.is_valid_file(fname):
+            return self.send_json(400, {"error": "Invalid file: " + str(fname)})
+        if not engine:
+            return self.send_json(400, {"error": "Invalid search engine"})
+
+        job = self.server.jobs.submit(fname, engine)
+        self.send_json(202, {k: v for k, v in job.items() if k != "matches"})
+
+    def log_message(self, format, *args):
+        pp.err("%s - %s" % (self.address_string(), format % args))
+
+
+def make_server(host=None, port=None, engine="ALL"):
+    """Creates (not started) HTTP server with its own job queue"""
+    if host is None:
+        host = pp.SERVER_HOST
+    if port is None:
+        port = pp.SERVER_PORT
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.engine = engine
+    server.jobs = JobQueue(engine)
+    return server
+
+
+def serve(host=None, port=None, engine="ALL", max_description=0):
+    """Runs HTTP service until interrupted"""
+    pp.DESCRIPTION_MAX_CHARS = max_description
+    # page cache only pays off when the process outlives a single run
+    if not pp.CACHE_MAX_BYTES:
+        pp.CACHE_MAX_BYTES = pp.SERVER_CACHE_MAX_BYTES
+    server = make_server(host, port, engine)
+    pp.err("Serving on http://%s:%d" % server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Paper published local HTTP service")
+    parser.add_argument("--host", action="store", default=pp.SERVER_HOST)
+    parser.add_argument("--port", action="store", type=int, default=pp.SERVER_PORT)
+    parser.add_argument(
+        "-e",
+        "--engine",
+        action="store",
+        help="Default search engines to query " + ", ".join(pp.VALID_SEARCH_ENGINES),
+        default="ALL",
+    )
+    parser.add_argument(
+        "--max-description",
+        action="store",
+        type=int,
+        default=0,
+        help="Truncate result descriptions to MAX_DESCRIPTION characters to save memory",
+    )
+    args = parser.parse_args()
+    if not pp.is_valid_engine(args.engine):
+        pp.err("Invalid search engine requested: " + args.engine)
+        sys.exit(3)
+    serve(args.host, args.port, args.engine.upper(), args.max_description)
+    sys.exit(0)
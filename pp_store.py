@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ********************************************************
+# Columnar (Parquet) results store for analytics across runs.
+#
+# Each run's scored matches (incl. editor when the input has
+# an "Editor Full Name" column) are appended to a Parquet dataset
+# partitioned by run date (run_date=YYYY-MM-DD/). Query loads
+# them back pushing column selection & filters down to the
+# files so only matching partitions/row groups are read.
+#
+# Requires optional dependency pyarrow (pip3 install pyarrow)
+#
+# python3 pp.py -f <input-file> --parquet <dataset-dir>
+# ********************************************************
+
+import time
+
+import pp
+
+
+def available():
+    """Returns True if optional pyarrow dependency is installed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("manuscript_id", pa.string()),
+            ("manuscript_type", pa.string()),
+            ("editor", pa.string()),
+            ("title", pa.string()),
+            ("authors", pa.string()),
+            ("search_title", pa.string()),
+            ("page_title", pa.string()),
+            ("page_authors", pa.string()),
+            ("direct", pa.int16()),
+            ("partial", pa.int16()),
+            ("author_overlap", pa.int16()),
+            ("confident", pa.bool_()),
+            ("link", pa.string()),
+            ("engine", pa.dictionary(pa.int8(), pa.string())),
+            ("run_ts", pa.timestamp("s", tz="UTC")),
+            ("run_date", pa.string()),
+        ]
+    )
+
+
+def append(root=None, matches=None, ts=None):
+    """
+    Appends matches (output of pp.score) of a single run to dataset at root.
+    Returns number of rows written.
+    """
+    if not root or not matches:
+        return 0
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if ts is None:
+        ts = int(time.time())
+    run_date = time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+    columns = {
+        "manuscript_id": [str(m[pp.ID]) for m in matches],
+        "manuscript_type": [str(m[pp.TYPE]) for m in matches],
+        "editor": [str(m.get(pp.EDITOR, "")) for m in matches],
+        "title": [m[pp.TITLE] for m in matches],
+        "authors": [str(m[pp.AUTHORS]) for m in matches],
+        "search_title": [m["search_title"] for m in matches],
+        "page_title": [m["page_title"] for m in matches],
+        "page_authors": [m["page_authors"] for m in matches],
+        "direct": [m["direct"] for m in matches],
+        "partial": [m["partial"] for m in matches],
+        "author_overlap": [m["author_overlap"] for m in matches],
+        "confident": [m["confident"] for m in matches],
+        "link": [m["link"] for m in matches],
+        "engine": [m.get("engine", "") for m in matches],
+        "run_ts": [ts] * len(matches),
+        "run_date": [run_date] * len(matches),
+    }
+    table = pa.Table.from_pydict(columns, schema=schema())
+    pq.write_to_dataset(table, str(root), partition_cols=["run_date"])
+    return table.num_rows
+
+
+def query(root=None, columns=None, filters=None):
+    """
+    Loads dataset at root as a pyarrow Table. Column selection and filters,
+    e.g. [("run_date", ">=", "2026-01-01"), ("partial", ">=", 90)], are pushed
+    down so only matching partitions & row groups are read.
+    """
+    if not root:
+        return None
+
+    import pyarrow.parquet as pq
+
+    return pq.read_table(
+        str(root), columns=columns, filters=filters, partitioning="hive"
+    )
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pp
+
+
+class FakeSearch:
+    """
+    Offline stand-in for pp.search. Each query returns one hit whose titles
+    equal the query unless overridden in results; every call is recorded.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.results = {}
+        self.before = None  # optional hook run at start of each call
+        self.cancelled = None  # cancelled callable passed on last call
+
+    def __call__(self, paper_title=None, engine="ALL", cancelled=None):
+        self.cancelled = cancelled
+        if self.before:
+            self.before()
+        self.queries.append(paper_title)
+        if paper_title in self.results:
+            return self.results[paper_title]
+        link = "https://example.com/" + engine + "/" + paper_title
+        return [pp.SearchResult(engine, link, paper_title, paper_title)]
+
+
+@pytest.fixture
+def fake_search(monkeypatch):
+    """Patches pp.search with a FakeSearch and disables throttling"""
+    fake = FakeSearch()
+    monkeypatch.setattr(pp, "search", fake)
+    monkeypatch.setattr(pp, "THROTTLE_SECS", 0)
+    return fake
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+import pp
+
+pytest.importorskip("tkinter")
+import gui  # noqa: E402
+
+
+def drain(worker):
+    worker.tasks.join()
+    messages = []
+    while not worker.results.empty():
+        messages.append(worker.results.get_nowait())
+    return messages
+
+
+def test_worker_titles(fake_search):
+    worker = gui.SearchWorker("PMC")
+    worker.submit_title("First Title")
+    worker.submit_title("  ")
+    worker.submit_title("Second Title")
+    messages = drain(worker)
+    matches = [m for kind, m in messages if kind == "match"]
+    assert [m[pp.TITLE] for m in matches] == ["First Title", "Second Title"]
+    assert ("status", "Done") in messages
+
+
+def test_worker_cancel(fake_search):
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    fake_search.before = block
+    worker = gui.SearchWorker("PMC")
+    worker.submit_title("In Flight")
+    worker.submit_title("Queued")
+    assert started.wait(5)
+    assert not fake_search.cancelled()
+    worker.cancel()
+    # in-flight search sees the cancel and stops fetching further pages
+    assert fake_search.cancelled()
+    release.set()
+    messages = drain(worker)
+    assert not [m for kind, m in messages if kind == "match"]
+    assert messages[-1] == ("status", "Cancelled")
+    assert fake_search.queries == ["In Flight"]
+
+    # new searches after cancel still run
+    worker.submit_title("After Cancel")
+    messages = drain(worker)
+    assert [m[pp.TITLE] for kind, m in messages if kind == "match"] == ["After Cancel"]
+
+
+def test_worker_cancel_idle():
+    worker = gui.SearchWorker("PMC")
+    worker.cancel()
+    assert drain(worker) == [("status", "Cancelled")]
+
+
+def test_worker_error():
+    worker = gui.SearchWorker("PMC")
+    worker.submit_file("missing.csv")
+    assert drain(worker)[0][0] == "error"
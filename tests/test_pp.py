@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import gzip
+import subprocess
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from os.path import abspath
 from os.path import dirname as d
 from pathlib import Path
@@ -111,6 +116,14 @@ def test_extract_csv():
     assert result[0]["Age"] == "46"
 
 
+def test_extract_file_editor():
+    result = pp.extract_file(str(Path(ROOT_DIR + "/test-manuscripts.csv")))
+    assert result[0][pp.EDITOR] == "Ellerton, Elaine"
+    hit = pp.SearchResult("PMC", "https://a", "", result[0][pp.TITLE])
+    matches = pp.score(result[0], [hit])
+    assert matches[0][pp.EDITOR] == "Ellerton, Elaine"
+
+
 def test_output_table(capsys):
     pp.output_table()
     out, err = capsys.readouterr()
@@ -132,7 +145,7 @@ def test_google_search():
     assert results
     found = False
     for result in results:
-        if result["link"] == "https://cjbarker.com/":
+        if result.link == "https://cjbarker.com/":
             found = True
             break
     assert found
@@ -148,12 +161,384 @@ def test_pubmed_search():
     found_link = False
     found_authors = False
     for result in results:
-        if result["link"] == "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC4704947/":
+        if result.link == "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC4704947/":
             found_link = True
         if (
-            result["page_authors"]
+            result.page_authors
             == "Juliana Chen, Janet E Cade, Margaret Allman-Farinelli"
         ):
             found_authors = True
     assert found_link
     assert found_authors
+
+
+def test_page_cache(monkeypatch):
+    monkeypatch.setattr(pp, "PAGE_CACHE", {})
+    monkeypatch.setattr(pp, "CACHE_BYTES", 0)
+    monkeypatch.setattr(pp, "CACHE_MAX_BYTES", 0)
+    pp.cache_put("a", b"1")
+    assert pp.cache_get("a") is None  # disabled by default
+
+    monkeypatch.setattr(pp, "CACHE_MAX_BYTES", 4)
+    assert pp.cache_get(None) is None
+    pp.cache_put("a", b"11")
+    pp.cache_put("b", b"2")
+    pp.cache_put("b", b"22")  # replacing entry frees its old size
+    assert pp.cache_get("a") == b"11"
+    pp.cache_put("c", b"3")
+    assert pp.cache_get("a") is None
+    assert pp.cache_get("c") == b"3"
+    assert pp.CACHE_BYTES == 3
+    pp.cache_put("d", b"too large")
+    assert pp.cache_get("d") is None
+
+    monkeypatch.setattr(pp, "CACHE_TTL_SECS", -1)
+    assert pp.cache_get("c") is None
+
+
+class RevalidatingHandler(BaseHTTPRequestHandler):
+    """Serves gzip encoded page with ETag & Last-Modified answering 304 when unchanged"""
+
+    statuses = []
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") in ('"v1"', '"v2"'):
+            self.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", '"v2"')
+            self.end_headers()
+            return
+        body = b"<html>page</html>"
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.statuses.append(200)
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Last-Modified", "Mon, 19 Oct 2026 00:00:00 GMT")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_get_page_revalidate(monkeypatch):
+    monkeypatch.setattr(pp, "PAGE_CACHE", {})
+    monkeypatch.setattr(pp, "CACHE_BYTES", 0)
+    monkeypatch.setattr(pp, "CACHE_MAX_BYTES", 1024)
+    server = HTTPServer(("127.0.0.1", 0), RevalidatingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://%s:%d/page" % server.server_address[:2]
+    try:
+        assert pp.get_page(url) == b"<html>page</html>"
+        assert pp.cache_entry(url)["etag"] == '"v1"'
+        assert pp.get_page(url) == b"<html>page</html>"  # fresh cache hit
+        assert RevalidatingHandler.statuses == [200]
+
+        monkeypatch.setattr(pp, "CACHE_TTL_SECS", -1)
+        assert pp.get_page(url) == b"<html>page</html>"  # 304 revalidated
+        assert RevalidatingHandler.statuses == [200, 304]
+        assert pp.cache_entry(url)["etag"] == '"v2"'  # validator from 304 kept
+
+        # entry evicted between revalidation request and 304 - refetch in full
+        monkeypatch.setattr(pp, "cache_refresh", lambda *args: None)
+        assert pp.get_page(url) == b"<html>page</html>"
+        assert RevalidatingHandler.statuses == [200, 304, 304, 200]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_accept_encoding():
+    assert "gzip" in pp.accept_encoding()
+
+
+def test_throttle(monkeypatch):
+    monkeypatch.setattr(pp, "LAST_THROTTLE", 0.0)
+    start = time.monotonic()
+    pp.throttle(0.2)
+    pp.throttle(0.2)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_score():
+    rec = {pp.ID: "1", pp.TITLE: "Curing Cancer with Bleach"}
+    results = [
+        pp.SearchResult(
+            "PMC",
+            "https://example.com/a",
+            "Curing Cancer with Bleach",
+            "Curing Cancer with Bleach",
+        ),
+        pp.SearchResult("PMC", "https://example.com/b", "Unrelated", "Unrelated"),
+    ]
+    assert not pp.score(None, results)
+    assert not pp.score(rec, None)
+    matches = pp.score(rec, results)
+    assert len(matches) == 1
+    assert matches[0]["link"] == "https://example.com/a"
+    assert matches[0]["direct"] == 100
+    assert matches[0][pp.AUTHORS] == "NA"
+
+
+def test_author_surnames():
+    assert pp.author_surnames(None) == frozenset()
+    assert pp.author_surnames("NA") == frozenset()
+    assert pp.author_surnames("Lv, Zhongwei") == {"lv"}
+    assert pp.author_surnames("Chen, Juliana; Cade, Janet E") == {"chen", "cade"}
+    assert pp.author_surnames("Chen J; Cade JE; Müller K") == {"chen", "cade", "muller"}
+    assert pp.author_surnames("Chen J, Cade JE") == {"chen", "cade"}
+    assert pp.author_surnames("Jones K, et al.") == {"jones"}
+    assert pp.author_surnames("John Smith and Maria Garcia") == {"smith", "garcia"}
+    assert pp.author_surnames(
+        "Juliana Chen, Janet E Cade, Margaret Allman-Farinelli"
+    ) == {"chen", "cade", "allman-farinelli"}
+
+    # particles and compound surnames
+    assert pp.author_surnames("van Beethoven L; de la Cruz J") == {"beethoven", "cruz"}
+    assert pp.author_surnames("Ludwig van Beethoven, Juan de la Cruz") == {
+        "beethoven",
+        "cruz",
+    }
+    assert pp.author_surnames("Garcia Lopez M") == {"lopez"}
+    assert pp.author_surnames("Maria Garcia Lopez") == {"lopez"}
+    assert pp.author_surnames("Garcia Lopez, Maria; Smith, John") == {"lopez", "smith"}
+
+    # comma separated "Last, First" authors
+    assert pp.author_surnames("Li, Wei and Zhang, Yi") == {"li", "zhang"}
+    assert pp.author_surnames("Smith, John, Doe, Jane") == {"smith", "doe"}
+    assert pp.author_surnames("Smith, John E, Doe, Jane") == {"smith", "doe"}
+
+
+def test_author_words():
+    assert pp.author_words("NA") == frozenset()
+    assert pp.author_words("Wei Zhang, John Smith") == {"wei", "zhang", "john", "smith"}
+    assert pp.author_words("van Beethoven L, et al.") == {"beethoven"}
+
+
+def test_score_et_al():
+    title = "The Most Popular Smartphone Apps for Weight Loss"
+    rec = {pp.ID: "1", pp.TITLE: title, pp.AUTHORS: "Jones K, et al."}
+    hit = pp.SearchResult("PMC", "https://a", title, title, "Smith J, et al.")
+    assert not pp.score(rec, [hit])
+
+    # shared given name keeps candidate but is not a shared author
+    rec[pp.AUTHORS] = "Wei Zhang, John Smith"
+    hit.page_authors = "Wei Li, John Doe"
+    matches = pp.score(rec, [hit])
+    assert [m["author_overlap"] for m in matches] == [0]
+    assert not matches[0]["confident"]
+
+    # particles and compound surnames in either name style
+    for authors, page_authors in [
+        ("van Beethoven L, de la Cruz J", "Ludwig van Beethoven, Juan de la Cruz"),
+        ("Garcia Lopez M, Smith J", "Maria Garcia Lopez, John Smith"),
+    ]:
+        rec[pp.AUTHORS] = authors
+        hit.page_authors = page_authors
+        matches = pp.score(rec, [hit])
+        assert [m["author_overlap"] for m in matches] == [2]
+        assert matches[0]["confident"]
+
+
+def test_score_author_overlap():
+    rec = {
+        pp.ID: "1",
+        pp.TITLE: "The Most Popular Smartphone Apps for Weight Loss",
+        pp.AUTHORS: "Chen, Juliana; Cade, Janet",
+    }
+    title = rec[pp.TITLE]
+    results = [
+        pp.SearchResult("PMC", "https://a", title, title, "Juliana Chen, Janet E Cade"),
+        pp.SearchResult("PMC", "https://b", title, title, "John Smith, Jane Roe"),
+        pp.SearchResult("PMC", "https://c", title, title, "Juliana Chen, Bob Roe"),
+        pp.SearchResult("GOOGLE", "https://d", title, title),
+    ]
+    matches = pp.score(rec, results)
+    assert [m["link"] for m in matches] == ["https://a", "https://c", "https://d"]
+    assert [m["author_overlap"] for m in matches] == [2, 1, 0]
+    assert [m["confident"] for m in matches] == [True, False, False]
+
+    # no input authors - nothing dropped, nothing confident
+    rec[pp.AUTHORS] = "NA"
+    matches = pp.score(rec, results)
+    assert len(matches) == 4
+    assert not any(m["confident"] for m in matches)
+
+
+def test_coalesce_query():
+    assert pp.coalesce_query([]) == ""
+    assert (
+        pp.coalesce_query(['A  "quoted"\ttitle', "B"])
+        == '"A quoted title"[Title] OR "B"[Title]'
+    )
+    assert pp.coalesce_query(["A", "B"], "GOOGLE") == '"A" OR "B"'
+
+
+def test_attribute():
+    titles = ["Curing Cancer with Bleach", "Smartphone Apps for Weight Loss"]
+    results = [
+        pp.SearchResult("PMC", "https://a", "", "Smartphone Apps for Weight Loss"),
+        pp.SearchResult("PMC", "https://b", "", "Curing Cancer with Bleach"),
+        pp.SearchResult("PMC", "https://c", "", "Unrelated Zebrafish Study"),
+    ]
+    attributed, ambiguous = pp.attribute(titles, results)
+    assert not ambiguous
+    assert [r.link for r in attributed[titles[0]]] == ["https://b"]
+    assert [r.link for r in attributed[titles[1]]] == ["https://a"]
+
+    attributed, ambiguous = pp.attribute(["Cancer A", "Cancer B"], results[1:2])
+    assert ambiguous == {"Cancer A", "Cancer B"}
+
+
+def test_batch_search_coalesced(monkeypatch, fake_search):
+    queries = fake_search.queries
+    records = [
+        {pp.TITLE: "Curing Cancer with Bleach"},
+        {pp.TITLE: "Smartphone Apps for Weight Loss"},
+        {pp.TITLE: "Curing Cancer with Bleach"},
+        {pp.TITLE: "Zebrafish Study"},
+    ]
+    query = pp.coalesce_query([r[pp.TITLE] for r in records[:2]], "PMC")
+    fake_search.results[query] = [
+        pp.SearchResult("PMC", "https://a", "", "Curing Cancer with Bleach"),
+        pp.SearchResult("PMC", "https://b", "", "Curing Cancer with Bleach!"),
+    ]
+
+    found = list(pp.batch_search(records, "PMC", 90))
+    assert [rec for rec, _ in found] == records
+    assert [r.link for r in found[0][1]] == ["https://a", "https://b"]
+    assert not found[1][1]
+    assert found[2][1] == found[0][1]
+    assert [r.page_title for r in found[3][1]] == ["Zebrafish Study"]  # group of one
+    assert len(queries) == 2
+
+    # full result page - coalesced hits may be missing, fall back per title
+    monkeypatch.setitem(pp.RESULTS_PER_PAGE, "PMC", 2)
+    queries.clear()
+    found = list(pp.batch_search(records[:2], "PMC", 200))
+    assert queries[1:] == [records[0][pp.TITLE], records[1][pp.TITLE]]
+    assert [r.page_title for r in found[1][1]] == [records[1][pp.TITLE]]
+
+    # failed (None) or empty coalesced request - every title searched on its own
+    monkeypatch.setitem(pp.RESULTS_PER_PAGE, "PMC", 20)
+    for failed in (None, []):
+        fake_search.results[query] = failed
+        queries.clear()
+        found = list(pp.batch_search(records[:2], "PMC", 500))
+        assert queries == [query, records[0][pp.TITLE], records[1][pp.TITLE]]
+        assert [r.page_title for r in found[0][1]] == [records[0][pp.TITLE]]
+        assert [r.page_title for r in found[1][1]] == [records[1][pp.TITLE]]
+
+    # no coalescing
+    queries.clear()
+    assert len(list(pp.batch_search(records, "PMC"))) == 4
+    assert len(queries) == 4
+
+
+def test_pubmed_search_cancelled(monkeypatch):
+    search_page = "".join(
+        '<div class="rslt"><div class="title"><a href="/pmc/articles/PMC%d/">T</a>'
+        "</div></div>" % i
+        for i in range(3)
+    )
+    fetched = []
+
+    def fake_get_page(url=None):
+        fetched.append(url)
+        return search_page.encode() if len(fetched) == 1 else b"<html></html>"
+
+    monkeypatch.setattr(pp, "get_page", fake_get_page)
+    assert len(pp.pubmed_search("T")) == 3
+    assert len(fetched) == 4
+
+    # cancelled after first article fetch - remaining articles skipped
+    fetched.clear()
+    results = pp.pubmed_search("T", lambda: len(fetched) >= 2)
+    assert len(results) == 1
+    assert len(fetched) == 2
+
+
+def test_search_failed(monkeypatch):
+    monkeypatch.setattr(pp, "get_page", lambda url=None: None)
+    assert pp.pubmed_search("T") is None
+    assert pp.google_search("T") is None
+    assert pp.search("T", "ALL") is None
+    assert pp.search(None) == []
+
+    # one engine failing still returns the other engine's (empty) results
+    monkeypatch.setattr(pp, "google_search", lambda paper_title=None: [])
+    assert pp.search("T", "ALL") == []
+
+
+def test_search_result(monkeypatch):
+    assert pp.SearchResult("PMC", description="x" * 5000).description == "x" * 5000
+
+    monkeypatch.setattr(pp, "DESCRIPTION_MAX_CHARS", 5)
+    a = pp.SearchResult("PMC", "https://example.com/a?x=1", "A", "A", "", "0123456789")
+    b = pp.SearchResult("".join(["P", "MC"]), "https://example.com/b")
+    assert a.link == "https://example.com/a?x=1"
+    assert a.host is b.host
+    assert a.engine is b.engine
+    assert a.description == "01234"
+    assert not hasattr(a, "__dict__")
+    assert a.as_dict() == {
+        "link": "https://example.com/a?x=1",
+        "search_title": "A",
+        "page_title": "A",
+        "description": "01234",
+        "page_authors": "",
+    }
+    assert pp.SearchResult("GOOGLE", "/relative").link == "/relative"
+
+
+def test_output_table_search_result(capsys):
+    pp.output_table(
+        pp.SearchResult("PMC", "https://example.com/a", "Jane"), add_hdr=True
+    )
+    out, err = capsys.readouterr()
+    assert "Jane" in out
+
+
+def import_time(*args):
+    """Runs pp in fresh interpreter with -X importtime returning stdout & {module: secs}"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative) / 1e6
+    return proc.stdout, modules
+
+
+def test_startup_import_time():
+    _, modules = import_time("-c", "import pp")
+    for heavy in HEAVY_MODULES:
+        assert heavy not in modules
+    assert modules["pp"] < STARTUP_BUDGET_SECS
+
+
+def test_startup_help():
+    start = time.monotonic()
+    out, modules = import_time("pp.py", "--help")
+    elapsed = time.monotonic() - start
+    assert "--search" in out
+    for heavy in HEAVY_MODULES:
+        assert heavy not in modules
+    assert elapsed < HELP_BUDGET_SECS  # includes interpreter startup
+
+
+HEAVY_MODULES = ["requests", "bs4", "xlrd", "xlsxwriter", "rich", "fuzzywuzzy"]
+STARTUP_BUDGET_SECS = 0.1
+HELP_BUDGET_SECS = 1.0
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import time
+
+import xlrd
+
+import pp
+import pp_queue
+
+
+def records(n):
+    return [
+        {pp.ID: "M-" + str(i), pp.TITLE: "Title " + str(i), pp.TYPE: "Article"}
+        for i in range(n)
+    ]
+
+
+def test_claim_and_lease_expiry(tmp_path):
+    conn = pp_queue.connect(str(tmp_path / "q.db"))
+    assert pp_queue.load(conn, records(1)) == 1
+
+    record_id, rec = pp_queue.claim(conn, "w1", lease_secs=-1)
+    assert rec[pp.ID] == "M-0"
+
+    # expired lease is reclaimed by another worker; first worker loses it
+    assert pp_queue.claim(conn, "w2")[0] == record_id
+    assert pp_queue.claim(conn, "w3") is None
+    assert not pp_queue.complete(conn, record_id, "w1", [])
+    assert pp_queue.complete(conn, record_id, "w2", [{"x": 1}])
+    assert pp_queue.status(conn) == {"done": 1}
+
+
+def test_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(pp_queue, "MAX_ATTEMPTS", 2)
+    conn = pp_queue.connect(str(tmp_path / "q.db"))
+    pp_queue.load(conn, records(1))
+    assert pp_queue.claim(conn, "w1", lease_secs=-1)
+    assert pp_queue.claim(conn, "w2", lease_secs=-1)
+    assert pp_queue.claim(conn, "w3") is None
+    assert pp_queue.status(conn) == {"failed": 1}
+
+
+def test_crashed_worker_retried(tmp_path, monkeypatch, fake_search):
+    monkeypatch.setattr(pp_queue, "POLL_SECS", 0.05)
+    db = str(tmp_path / "q.db")
+    conn = pp_queue.connect(db)
+    pp_queue.load(conn, records(3))
+
+    # worker dies holding a lease on the first record
+    assert pp_queue.claim(conn, "dead", lease_secs=0.5)
+
+    start = time.monotonic()
+    assert pp_queue.work(db, "PMC") == 3
+    assert time.monotonic() - start >= 0.4
+    assert pp_queue.status(conn) == {"done": 3}
+    assert pp_queue.outstanding(conn) == 0
+
+
+def test_workers_and_merge(tmp_path, monkeypatch, fake_search):
+    # slow enough for every worker to get a share
+    fake_search.before = lambda: time.sleep(0.02)
+    monkeypatch.setattr(pp_queue, "POLL_SECS", 0.05)
+    db = str(tmp_path / "q.db")
+    conn = pp_queue.connect(db)
+    pp_queue.load(conn, records(40))
+
+    # forked workers inherit the patched search
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=pp_queue.work, args=(db, "PMC")) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(60)
+        assert w.exitcode == 0
+
+    assert pp_queue.status(conn) == {"done": 40}
+    owners = conn.execute("SELECT COUNT(DISTINCT owner) FROM records").fetchone()
+    assert owners[0] > 1
+
+    fname = str(tmp_path / "out.xlsx")
+    assert pp_queue.merge(conn, fname) == 40
+    ws = xlrd.open_workbook(fname).sheet_by_index(0)
+    assert ws.nrows == 41
+    assert [ws.cell_value(i, 0) for i in range(1, 41)] == [
+        "M-" + str(i) for i in range(40)
+    ]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import pp
+import pp_server
+
+
+@pytest.fixture
+def server(fake_search, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    srv = pp_server.make_server("127.0.0.1", 0, "PMC")
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield "http://%s:%d" % srv.server_address[:2]
+    srv.shutdown()
+    srv.server_close()
+
+
+def get_json(url, data=None):
+    req = urllib.request.Request(url, data=data)
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_search(server):
+    status, body = get_json(server + "/search?title=Curing%20Cancer")
+    assert status == 200
+    assert len(body["matches"]) == 1
+    assert body["matches"][0]["engine"] == "PMC"
+    assert body["matches"][0]["partial"] == 100
+
+    status, body = get_json(server + "/search?title=Curing&engine=google")
+    assert body["matches"][0]["engine"] == "GOOGLE"
+
+    assert get_json(server + "/search")[0] == 400
+    assert get_json(server + "/search?title=a&engine=foo")[0] == 400
+    assert get_json(server + "/foo")[0] == 404
+
+
+def test_jobs(server, tmp_path):
+    fname = tmp_path / "input.csv"
+    fname.write_text(
+        "Manuscript ID,Manuscript Title,Author Names,Manuscript Type\n"
+        "M-1,First Title,Doe,Article\n"
+        "M-2,Second Title,Roe,Article\n"
+    )
+    status, job = get_json(server + "/jobs", json.dumps({"file": str(fname)}).encode())
+    assert status == 202
+    assert job["status"] == "queued"
+
+    for _ in range(100):
+        status, job = get_json(server + "/jobs/" + str(job["id"]))
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "done"
+    assert job["processed"] == job["total"] == 2
+    assert [m[pp.ID] for m in job["matches"]] == ["M-1", "M-2"]
+    assert (tmp_path / job["output"]).is_file()
+
+    status, body = get_json(server + "/jobs")
+    assert [j["id"] for j in body["jobs"]] == [job["id"]]
+
+    bad = json.dumps({"file": "missing.csv"}).encode()
+    assert get_json(server + "/jobs", bad)[0] == 400
+    assert get_json(server + "/jobs/999")[0] == 404
+
+
+def test_job_pruning(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(pp, "SERVER_MAX_FINISHED_JOBS", 1)
+    fname = tmp_path / "input.csv"
+    fname.write_text("Manuscript ID,Manuscript Title\nM-1,First Title\n")
+    ids = []
+    for _ in range(3):
+        status, job = get_json(
+            server + "/jobs", json.dumps({"file": str(fname)}).encode()
+        )
+        ids.append(job["id"])
+
+    for _ in range(100):
+        status, body = get_json(server + "/jobs")
+        if [j["status"] for j in body["jobs"]] == ["done"]:
+            break
+        time.sleep(0.05)
+    assert [j["id"] for j in body["jobs"]] == ids[-1:]
+    assert get_json(server + "/jobs/" + str(ids[0]))[0] == 404
+
+
+def test_serve_flags(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pp, "DESCRIPTION_MAX_CHARS", 0)  # restored after main()
+    monkeypatch.setattr(pp_server, "serve", lambda *args: calls.append(args))
+    monkeypatch.setattr(
+        sys, "argv", ["pp.py", "--serve", "--port", "0", "--max-description", "50"]
+    )
+    with pytest.raises(SystemExit) as e:
+        pp.main()
+    assert e.value.code == 0
+    assert calls == [(pp.SERVER_HOST, 0, "ALL", 50)]
+
+    monkeypatch.setattr(sys, "argv", ["pp.py", "--serve", "--coalesce"])
+    with pytest.raises(SystemExit) as e:
+        pp.main()
+    assert e.value.code == 5
+    assert len(calls) == 1
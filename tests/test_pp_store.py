@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pp
+import pp_store
+
+pytest.importorskip("pyarrow")
+
+
+def match(ms_id, ms_type, partial, engine="PMC", editor="Ellerton, Elaine"):
+    return {
+        pp.ID: ms_id,
+        pp.TITLE: "Title " + ms_id,
+        pp.AUTHORS: "Doe",
+        pp.TYPE: ms_type,
+        pp.EDITOR: editor,
+        "search_title": "Title",
+        "page_title": "Title",
+        "page_authors": "",
+        "direct": partial,
+        "partial": partial,
+        "author_overlap": 0,
+        "confident": False,
+        "link": "https://example.com/" + ms_id,
+        "description": "",
+        "engine": engine,
+    }
+
+
+def test_append_and_query(tmp_path):
+    root = tmp_path / "results"
+    assert pp_store.available()
+    assert pp_store.append(root, []) == 0
+    assert pp_store.query(None) is None
+
+    day = 86400
+    assert pp_store.append(root, [match("M-1", "Article", 95)], ts=0) == 1
+    assert (
+        pp_store.append(
+            root,
+            [match("M-2", "Review", 70), match("M-3", "Article", 99, editor="Roe, Jo")],
+            ts=day,
+        )
+        == 2
+    )
+    assert {p.name for p in root.iterdir()} == {
+        "run_date=1970-01-01",
+        "run_date=1970-01-02",
+    }
+
+    table = pp_store.query(root)
+    assert table.num_rows == 3
+
+    table = pp_store.query(
+        root,
+        columns=["manuscript_id", "partial"],
+        filters=[("run_date", "=", "1970-01-02"), ("partial", ">=", 90)],
+    )
+    assert table.column_names == ["manuscript_id", "partial"]
+    assert table.column("manuscript_id").to_pylist() == ["M-3"]
+
+    table = pp_store.query(
+        root, columns=["editor"], filters=[("editor", "=", "Roe, Jo")]
+    )
+    assert table.num_rows == 1